@@ -0,0 +1,228 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+
+import numpy as np
+import zmq
+
+from communication import serialize_weights
+from config import LOG_FORMAT, LOOK_BACK, RANDOM_STATE, BATCH_SIZE, INFERENCE_PORTS
+from edge import NumpyForecaster
+from inference import InferenceServer
+from model import ARCHITECTURES, create_model, effective_precision
+
+
+def client_worker(context, port, num_requests, windows, latencies, errors):
+    """
+    One load-generator client: a REQ socket sending forecast requests back-to-back,
+    cycling through its windows in order. Latencies are recorded as (seconds, cached).
+    """
+    socket = context.socket(zmq.REQ)
+    socket.connect(f"tcp://localhost:{port}")
+
+    for i in range(num_requests):
+        window = windows[i % len(windows)]
+        start = time.perf_counter()
+        socket.send(json.dumps({"op": "forecast", "window": window.tolist()}).encode())
+        reply = json.loads(socket.recv())
+        if "error" in reply:
+            errors.append(reply["error"])
+        latencies.append((time.perf_counter() - start, reply.get("cached", False)))
+
+    socket.close(linger=0)
+
+
+def run_inference_benchmark(clients=8, requests_per_client=500, unique_windows=None, port=None):
+    """
+    Start a standalone inference server and hammer it with concurrent clients.
+
+    unique_windows controls the cache hit rate: fewer unique windows -> more hits.
+    By default every request sends a different window, so all of them go
+    through the micro-batched model call. Latency percentiles are reported
+    separately for cache misses.
+    Returns a dict with requests/sec and latency percentiles (ms).
+    """
+    context = zmq.Context()
+    port = port or INFERENCE_PORTS[0]
+    unique_windows = unique_windows or clients * requests_per_client
+
+    server = InferenceServer(node_id=0, context=context, port=port)
+    server.update_model(create_model(LOOK_BACK).get_weights())
+    server.start()
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    windows = rng.standard_normal((unique_windows, LOOK_BACK)).astype(np.float32)
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(
+            target=client_worker,
+            # Interleaved slices: clients only repeat windows once the pool is exhausted
+            args=(context, port, requests_per_client, windows[k::clients], latencies, errors),
+        )
+        for k in range(clients)
+    ]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    server.stop()
+    context.term()
+
+    latencies_ms = np.array([latency for latency, _ in latencies]) * 1000.0
+    cached = np.array([hit for _, hit in latencies], dtype=bool)
+    miss_ms = latencies_ms[~cached]
+    results = {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "miss_p50_ms": float(np.percentile(miss_ms, 50)) if len(miss_ms) else None,
+        "miss_p99_ms": float(np.percentile(miss_ms, 99)) if len(miss_ms) else None,
+        "batches": server.batches_run,
+        "cache_hits": server.cache.hits,
+    }
+    logging.info(
+        f"Inference benchmark: {results['requests_per_sec']:.1f} req/s, "
+        f"p50={results['p50_ms']:.2f} ms, p99={results['p99_ms']:.2f} ms, "
+        f"batches={results['batches']}, cache hits={results['cache_hits']}, "
+        f"errors={results['errors']}"
+    )
+    if len(miss_ms):
+        logging.info(
+            f"Cache misses only ({len(miss_ms)} requests): "
+            f"p50={results['miss_p50_ms']:.2f} ms, p99={results['miss_p99_ms']:.2f} ms"
+        )
+    return results
+
+
+# Max |Keras - NumPy| forecast difference accepted, per effective precision
+PARITY_TOLERANCE = {"float32": 1e-4, "mixed_bfloat16": 5e-2}
+
+
+def check_numpy_parity(model, X):
+    """
+    Compare NumpyForecaster with model.predict on the same inputs.
+    Returns (max absolute difference, within tolerance).
+    """
+    expected = model.predict(X, verbose=0).reshape(-1)
+    actual = NumpyForecaster.from_model(model).predict(X)
+    max_error = float(np.max(np.abs(expected - actual)))
+    return max_error, max_error <= PARITY_TOLERANCE[effective_precision(model)]
+
+
+def run_parity_check(architectures=tuple(ARCHITECTURES), samples=256):
+    """
+    NumPy vs Keras parity for every architecture. Returns True if all pass.
+    """
+    rng = np.random.default_rng(RANDOM_STATE)
+    X = rng.standard_normal((samples, LOOK_BACK)).astype(np.float32)
+
+    all_ok = True
+    for architecture in architectures:
+        model = create_model(LOOK_BACK, architecture=architecture, precision="float32")
+        max_error, ok = check_numpy_parity(model, X)
+        all_ok = all_ok and ok
+        status = "ok" if ok else "FAILED"
+        log = logging.info if ok else logging.error
+        log(f"Parity {architecture}: max |Keras - NumPy| = {max_error:.2e} ({status})")
+    return all_ok
+
+
+def profile_model(architecture, precision="float32", steps=50, batch_size=BATCH_SIZE):
+    """
+    Cost of one model variant: parameter count, bytes per weight broadcast,
+    training steps/sec and Keras vs NumPy inference latency.
+    """
+    rng = np.random.default_rng(RANDOM_STATE)
+    X = rng.standard_normal((batch_size, LOOK_BACK)).astype(np.float32)
+    y = rng.standard_normal(batch_size).astype(np.float32)
+
+    model = create_model(LOOK_BACK, architecture=architecture, precision=precision)
+    model.train_on_batch(X, y)  # warm-up (graph tracing)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        model.train_on_batch(X, y)
+    steps_per_sec = steps / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        model(X, training=False)
+    keras_ms = (time.perf_counter() - start) / steps * 1000.0
+
+    parity_error, parity_ok = check_numpy_parity(model, X)
+    if not parity_ok:
+        logging.error(f"NumPy forecaster for {architecture} differs from Keras by {parity_error:.2e}.")
+
+    forecaster = NumpyForecaster.from_model(model)
+    start = time.perf_counter()
+    for _ in range(steps):
+        forecaster.predict(X)
+    numpy_ms = (time.perf_counter() - start) / steps * 1000.0
+
+    results = {
+        "architecture": architecture,
+        "requested_precision": precision,
+        "precision": effective_precision(model),
+        "params": model.count_params(),
+        "bytes_per_broadcast": len(serialize_weights(model.get_weights())),
+        "steps_per_sec": steps_per_sec,
+        "keras_predict_ms": keras_ms,
+        "numpy_predict_ms": numpy_ms,
+        "numpy_max_abs_error": parity_error,
+    }
+    logging.info(
+        f"Model {architecture} ({results['precision']}): {results['params']} params, "
+        f"{results['bytes_per_broadcast']} bytes/broadcast, {steps_per_sec:.1f} steps/s, "
+        f"predict {keras_ms:.2f} ms (Keras) / {numpy_ms:.2f} ms (NumPy, "
+        f"max error {parity_error:.2e})"
+    )
+    return results
+
+
+def run_model_benchmark(architectures=tuple(ARCHITECTURES), precisions=("float32",), steps=50):
+    return [profile_model(a, p, steps) for a in architectures for p in precisions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-generator and model benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    inference = subparsers.add_parser("inference", help="Load-test the inference server.")
+    inference.add_argument("--clients", type=int, default=8)
+    inference.add_argument("--requests", type=int, default=500, help="Requests per client.")
+    inference.add_argument(
+        "--unique-windows", type=int, default=None, help="Default: one per request (no cache hits)."
+    )
+    inference.add_argument("--port", type=int, default=None)
+
+    models = subparsers.add_parser("models", help="Compare model variants.")
+    models.add_argument("--architectures", nargs="+", default=list(ARCHITECTURES))
+    models.add_argument("--precisions", nargs="+", default=["float32", "mixed_bfloat16"])
+    models.add_argument("--steps", type=int, default=50)
+
+    parity = subparsers.add_parser("parity", help="Check NumPy vs Keras forecasts.")
+    parity.add_argument("--architectures", nargs="+", default=list(ARCHITECTURES))
+
+    args = parser.parse_args()
+    logging.basicConfig(level="INFO", format=LOG_FORMAT)
+
+    if args.command == "inference":
+        run_inference_benchmark(args.clients, args.requests, args.unique_windows, args.port)
+    elif args.command == "parity":
+        sys.exit(0 if run_parity_check(args.architectures) else 1)
+    else:
+        run_model_benchmark(args.architectures, args.precisions, args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import zmq
+import time
 import pickle
 import logging
 import numpy as np
@@ -45,6 +46,107 @@ def deserialize_weights(serialized_weights):
     """Convert received bytes back to Python objects."""
     return pickle.loads(serialized_weights)
 
+def weights_drift(weights, reference_weights):
+    """
+    Relative L2 distance between two weight lists:
+    ||weights - reference|| / ||reference||, computed over all layers.
+    """
+    diff_sq = sum(float(np.sum(np.square(w - r))) for w, r in zip(weights, reference_weights))
+    ref_sq = sum(float(np.sum(np.square(r))) for r in reference_weights)
+    return np.sqrt(diff_sq) / (np.sqrt(ref_sq) + 1e-12)
+
+def is_stats_message(message):
+    """True for messages sent by exchange_stats (as opposed to model weights)."""
+    return isinstance(message, dict) and message.get("type") == "stats"
+
+def exchange_stats(
+    publisher_socket,
+    subscriber_sockets,
+    node_id,
+    stats,
+    timeout_ms,
+    max_hops,
+    republish_ms,
+    total_nodes=None,
+):
+    """
+    Gossip small per-node statistics over the existing mesh.
+
+    Each node publishes the stats it knows (its own plus relayed ones, keyed
+    by node id so nothing is counted twice) once at the start and then only
+    when it learns something new; an entry travels at most max_hops hops
+    (use the graph diameter). Messages also carry the ids of the nodes that
+    already know all total_nodes stats. A node stops once every node is in
+    that set, so nobody leaves while a neighbor may still need a relay.
+    Until then it also re-publishes every republish_ms, which covers
+    subscribers that connect late. Without total_nodes, or if some stats
+    never arrive, the exchange ends at the timeout. Anything that is not a
+    stats message (e.g. weights) is ignored.
+
+    Returns ({node_id: stats} for the other nodes, number of neighbors heard from).
+    """
+    known = {node_id: (stats, 0)}  # node id -> (stats, hops travelled)
+    complete_nodes = set()  # nodes known to have everyone's stats
+    heard_from = set()
+
+    def absorb(sock, raw):
+        """Merge one message; True if it taught us something new."""
+        message = deserialize_weights(raw)
+        if not is_stats_message(message):
+            return False
+        heard_from.add(sock)
+        learned = not complete_nodes.issuperset(message["complete"])
+        complete_nodes.update(message["complete"])
+        for nid, (node_stats, hops) in message["stats"].items():
+            if nid not in known or hops + 1 < known[nid][1]:
+                known[nid] = (node_stats, hops + 1)
+                learned = True
+        return learned
+
+    poller = zmq.Poller()
+    for sock in subscriber_sockets:
+        poller.register(sock, zmq.POLLIN)
+
+    changed = True  # publish our own stats right away
+    deadline = time.monotonic() + timeout_ms / 1000.0
+    next_publish = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if total_nodes is not None and len(known) >= total_nodes:
+            complete_nodes.add(node_id)
+        finished = total_nodes is not None and len(complete_nodes) >= total_nodes
+        if changed or (not finished and now >= next_publish):
+            relay = {nid: entry for nid, entry in known.items() if entry[1] < max_hops}
+            message = {"type": "stats", "stats": relay, "complete": sorted(complete_nodes)}
+            publisher_socket.send(serialize_weights(message))
+            changed = False
+            next_publish = now + republish_ms / 1000.0
+        if finished or now >= deadline:
+            break
+
+        wait_ms = max(1, int((min(deadline, next_publish) - now) * 1000))
+        for sock, _ in poller.poll(timeout=wait_ms):
+            changed = absorb(sock, sock.recv()) or changed
+
+    # Empty the sockets so leftover stats do not queue up in front of the first weights
+    for sock in subscriber_sockets:
+        for message in drain(sock):
+            absorb(sock, message)
+
+    others = {nid: entry[0] for nid, entry in known.items() if nid != node_id}
+    return others, len(heard_from)
+
+def drain(subscriber_socket):
+    """
+    Return every message already queued on a socket (raw bytes, never blocks).
+    """
+    messages = []
+    while True:
+        try:
+            messages.append(subscriber_socket.recv(zmq.NOBLOCK))
+        except zmq.Again:
+            return messages
+
 def decompress_gradients(compressed_grads):
     """
     Convert int8 weights back to float values.
@@ -16,18 +16,81 @@ EPOCHS = 200
 LEARNING_RATE = 0.0001
 L2_REGULARIZATION = 0.01
 DROPOUT_RATE = 0.5
+# "dense" (512-256-128 MLP), "compact_mlp", "tcn" or "gru"
+MODEL_ARCHITECTURE = "dense"
+# "float32" or "mixed_bfloat16" (falls back to float32 if the CPU has no bf16 support)
+MODEL_PRECISION = "float32"
 
 # -------------------------
 # ZMQ PORTS (NETWORK SETUP)
 # -------------------------
 NODE_PORTS = {
-    0: {"subscribe": [5555, 5556], "publish": 5557},
+    0: {"subscribe": [5561, 5556], "publish": 5557},
     1: {"subscribe": [5557, 5556], "publish": 5558},
     2: {"subscribe": [5558, 5555], "publish": 5559},
     3: {"subscribe": [5559, 5555], "publish": 5560},
     4: {"subscribe": [5560, 5556], "publish": 5561},
 }
 
+# -------------------------
+# EVENT-TRIGGERED COMMUNICATION
+# -------------------------
+# A node only broadcasts when its weights drifted more than the threshold
+# (relative L2 norm since the last send) or after BROADCAST_MAX_INTERVAL skips.
+BROADCAST_DRIFT_THRESHOLD = 0.01
+BROADCAST_MIN_THRESHOLD = 0.001
+BROADCAST_MAX_THRESHOLD = 0.1
+BROADCAST_MAX_INTERVAL = 5
+# Streaming mode only: the threshold adapts to the trend (in gossip rounds) of the loss
+# on newly arrived samples, scored before the node trains on them.
+# Batch mode aggregates in memory and never broadcasts.
+BROADCAST_TREND_WINDOW = 5
+BROADCAST_PLATEAU_TOLERANCE = 0.01
+
+# -------------------------
+# INFERENCE SERVICE
+# -------------------------
+# One ROUTER socket per node; REQ clients ask for forecasts of the latest model.
+# Requests and replies are JSON (never pickle): clients are not trusted like mesh peers.
+ENABLE_INFERENCE_SERVER = False
+INFERENCE_HOST = "127.0.0.1"  # use "*" to listen on every interface
+INFERENCE_PORTS = {0: 5600, 1: 5601, 2: 5602, 3: 5603, 4: 5604}
+INFERENCE_MAX_BATCH = 64
+INFERENCE_BATCH_WINDOW_MS = 2
+INFERENCE_CACHE_SIZE = 4096
+INFERENCE_MAX_METERS = 10000  # meter ring buffers kept; least recently used are dropped
+# Keep serving the final (consensus) model after training: seconds, or None until Ctrl-C
+INFERENCE_SERVE_SECONDS = None
+
+# -------------------------
+# STREAMING (ONLINE LEARNING)
+# -------------------------
+# New readings come from a tailed CSV file, or from a ZMQ PUB feed if a port is set.
+STREAM_MODE = False
+STREAM_FILE = os.path.join("data", "stream.csv")
+STREAM_FEED_PORT = None
+STREAM_ROUNDS = 100
+STREAM_ROUND_INTERVAL = 1.0  # seconds between gossip rounds
+STREAM_MAX_READINGS_PER_ROUND = 256
+STREAM_REPLAY_CAPACITY = 2048
+STREAM_TRAIN_STEPS = 4
+
+# -------------------------
+# SHARED SCALER STATISTICS
+# -------------------------
+# Before training, nodes gossip count / mean / M2 (and optional quantile sketches) over
+# the mesh, relaying each node's stats up to SCALER_SYNC_HOPS hops. Nodes only end
+# up with identical statistics if every node can reach every other node within
+# that many hops. NODE_PORTS above forms a ring (0 -> 1 -> 2 -> 3 -> 4 -> 0), so they
+# can. If any node still misses some stats, main() refuses to start training.
+# This is not secure aggregation: stats are sent in the clear, nothing is masked.
+SHARED_SCALER = False
+SCALER_SYNC_TIMEOUT_MS = 2000
+SCALER_SYNC_REPUBLISH_MS = 250  # re-publish until every node has all stats (late subscribers)
+SCALER_SYNC_HOPS = len(NODE_PORTS) - 1  # upper bound on the graph diameter
+SCALER_SKETCH_SIZE = 101  # quantile levels per feature; None disables the sketches
+SCALER_ROBUST = False  # median / IQR from the quantile sketches instead of mean / std
+
 # -------------------------
 # LOGGING
 # -------------------------
@@ -0,0 +1,141 @@
+import json
+import logging
+import numpy as np
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+}
+
+
+class NumpyForecaster:
+    """
+    Pure-NumPy inference path for edge nodes (no TensorFlow needed to run it).
+
+    Built from a trained Keras model created by model.create_model; supports
+    the layers used there: Dense, Dropout, Reshape, causal Conv1D,
+    GlobalAveragePooling1D and GRU.
+    """
+
+    def __init__(self, layers):
+        # List of (kind, params) with plain numpy arrays / python values
+        self.layers = layers
+
+    @classmethod
+    def from_model(cls, model):
+        layers = []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+
+            if kind in ("InputLayer", "Dropout"):
+                continue
+            if kind == "Dense":
+                layers.append((kind, {"weights": weights, "activation": config["activation"]}))
+            elif kind == "Reshape":
+                layers.append((kind, {"shape": tuple(config["target_shape"])}))
+            elif kind == "Conv1D":
+                params = {
+                    "weights": weights,
+                    "activation": config["activation"],
+                    "dilation": config["dilation_rate"][0],
+                }
+                layers.append((kind, params))
+            elif kind == "GlobalAveragePooling1D":
+                layers.append((kind, {}))
+            elif kind == "GRU":
+                layers.append((kind, {"weights": weights, "units": config["units"]}))
+            else:
+                raise ValueError(f"Layer type {kind} is not supported by NumpyForecaster.")
+        return cls(layers)
+
+    def save(self, path):
+        """
+        Write an .npz file: the weight arrays plus a small JSON layer spec.
+        No pickle, so loading an artifact on an edge node cannot run code.
+        """
+        spec, arrays = [], {}
+        for i, (kind, params) in enumerate(self.layers):
+            weights = params.get("weights", [])
+            for j, w in enumerate(weights):
+                arrays[f"layer{i}_{j}"] = w
+            entry = {k: v for k, v in params.items() if k != "weights"}
+            spec.append({"kind": kind, "params": entry, "weights": len(weights)})
+
+        np.savez(path, spec=np.array(json.dumps(spec)), **arrays)
+        logging.info(f"NumPy forecaster written to {path}.")
+
+    @classmethod
+    def load(cls, path):
+        layers = []
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data["spec"]))
+            for i, entry in enumerate(spec):
+                params = dict(entry["params"])
+                if "shape" in params:
+                    params["shape"] = tuple(params["shape"])
+                if entry["weights"]:
+                    params["weights"] = [data[f"layer{i}_{j}"] for j in range(entry["weights"])]
+                layers.append((entry["kind"], params))
+        return cls(layers)
+
+    def predict(self, X):
+        """
+        Forecast a batch of windows, shape (batch, LOOK_BACK) -> (batch,).
+        """
+        x = np.asarray(X, dtype=np.float32)
+        for kind, params in self.layers:
+            if kind == "Dense":
+                kernel, bias = params["weights"]
+                x = ACTIVATIONS[params["activation"]](x @ kernel + bias)
+            elif kind == "Reshape":
+                x = x.reshape((len(x),) + params["shape"])
+            elif kind == "Conv1D":
+                x = self._causal_conv1d(x, params)
+            elif kind == "GlobalAveragePooling1D":
+                x = x.mean(axis=1)
+            elif kind == "GRU":
+                x = self._gru(x, params)
+        return x.reshape(-1)
+
+    @staticmethod
+    def _causal_conv1d(x, params):
+        """
+        x: (batch, steps, channels); kernel: (kernel_size, channels, filters).
+        """
+        kernel, bias = params["weights"]
+        dilation = params["dilation"]
+        kernel_size = kernel.shape[0]
+        steps = x.shape[1]
+
+        pad = (kernel_size - 1) * dilation
+        x = np.pad(x, ((0, 0), (pad, 0), (0, 0)))
+        out = bias + sum(
+            x[:, k * dilation : k * dilation + steps, :] @ kernel[k] for k in range(kernel_size)
+        )
+        return ACTIVATIONS[params["activation"]](out)
+
+    @staticmethod
+    def _gru(x, params):
+        """
+        Keras GRU (reset_after=True, gate order z, r, h) over x: (batch, steps, features).
+        """
+        kernel, recurrent_kernel, bias = params["weights"]
+        units = params["units"]
+        input_bias, recurrent_bias = bias[0], bias[1]
+        sigmoid = ACTIVATIONS["sigmoid"]
+
+        # Input projections for all steps at once
+        x_proj = x @ kernel + input_bias
+        h = np.zeros((len(x), units), dtype=np.float32)
+        for t in range(x.shape[1]):
+            h_proj = h @ recurrent_kernel + recurrent_bias
+            z = sigmoid(x_proj[:, t, :units] + h_proj[:, :units])
+            r = sigmoid(x_proj[:, t, units : 2 * units] + h_proj[:, units : 2 * units])
+            candidate = np.tanh(x_proj[:, t, 2 * units :] + r * h_proj[:, 2 * units :])
+            h = z * h + (1.0 - z) * candidate
+        return h
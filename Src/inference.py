@@ -0,0 +1,335 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import zmq
+
+from config import (
+    LOOK_BACK,
+    INFERENCE_HOST,
+    INFERENCE_MAX_BATCH,
+    INFERENCE_BATCH_WINDOW_MS,
+    INFERENCE_CACHE_SIZE,
+    INFERENCE_MAX_METERS,
+)
+from model import create_model
+
+
+class WindowBuffer:
+    """
+    Fixed-size ring buffer holding the last LOOK_BACK readings of one meter.
+    """
+
+    def __init__(self, size=LOOK_BACK):
+        self.size = size
+        self.values = np.zeros(size, dtype=np.float32)
+        self.position = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def window(self):
+        """
+        Return the readings in time order, or None until the buffer is full.
+        """
+        if self.count < self.size:
+            return None
+        return np.concatenate((self.values[self.position :], self.values[: self.position]))
+
+
+class ForecastCache:
+    """
+    Small LRU cache keyed by (window hash, model version).
+    A new model version never hits old entries, so nothing needs invalidating.
+    """
+
+    def __init__(self, max_size=INFERENCE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(window, version):
+        digest = hashlib.blake2b(window.tobytes(), digest_size=16).digest()
+        return digest, version
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+class InferenceServer:
+    """
+    Per-node forecasting service.
+
+    - Clients connect with a REQ socket and send JSON objects:
+        {"op": "observe", "meter": id, "values": [...]}   -> append readings
+        {"op": "forecast", "meter": id}                   -> forecast from the meter's buffer
+        {"op": "forecast", "window": [...]}               -> forecast from an explicit window
+    - Replies are JSON too; a malformed request gets {"error": ...} and never
+      stops the server.
+    - Concurrent forecast requests are micro-batched into a single model call.
+    - Two models are preallocated (double buffering): update_model() loads the
+      new weights into the standby one and swaps it in with a single reference
+      assignment, so requests never wait on aggregation.
+    """
+
+    def __init__(
+        self, node_id, context, port, input_shape=LOOK_BACK, scaler=None, host=INFERENCE_HOST
+    ):
+        self.node_id = node_id
+        self.context = context
+        self.port = port
+        self.host = host
+        self.input_shape = input_shape
+
+        # Meter id -> WindowBuffer, least recently used first (ids come from clients)
+        self.buffers = OrderedDict()
+        self.cache = ForecastCache()
+
+        # Double buffer: one model serves while the other receives new weights.
+        # Each model has a lock held while it predicts, so weights are never
+        # written into a model that a batch started on just before a swap.
+        self.models = [create_model(input_shape), create_model(input_shape)]
+        self.model_locks = [threading.Lock(), threading.Lock()]
+        # Each slot serves with the input scaling its weights were trained with.
+        # A slot's weights, scaler and version only change under its model lock.
+        self.scalers = [scaler, scaler]
+        self.versions = [-1, -1]
+        self.swap_lock = threading.Lock()
+        self.active = (None, -1)  # (model slot, version)
+        self.requests_served = 0
+        self.batches_run = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def update_model(self, weights, scaler=None):
+        """
+        Load new weights into the standby model and swap it in atomically.
+
+        If a scaler is given (e.g. the running scaler of a streaming node),
+        a snapshot of it is swapped in together with the weights; otherwise
+        the current scaling is kept.
+        """
+        with self.swap_lock:
+            slot, version = self.active
+            standby = 0 if slot is None else 1 - slot
+            with self.model_locks[standby]:
+                self.models[standby].set_weights(weights)
+                if scaler is not None:
+                    self.scalers[standby] = copy.deepcopy(scaler)
+                elif slot is not None:
+                    self.scalers[standby] = self.scalers[slot]
+                version += 1
+                self.versions[standby] = version
+            self.active = (standby, version)
+        logging.info(f"Node {self.node_id} inference model swapped to version {version}.")
+        return version
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        logging.info(
+            f"Node {self.node_id} inference server listening on {self.host}:{self.port}."
+        )
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        logging.info(
+            f"Node {self.node_id} inference server stopped "
+            f"(served={self.requests_served}, batches={self.batches_run}, "
+            f"cache hits={self.cache.hits}, misses={self.cache.misses})."
+        )
+
+    def predict_batch(self, windows):
+        """
+        Forecast a batch of raw windows with the active model in one call.
+        Returns (forecasts, version).
+        """
+        slot = self.active[0]
+        if slot is None:
+            raise RuntimeError("No model loaded yet.")
+
+        batch = np.asarray(windows, dtype=np.float32)
+        with self.model_locks[slot]:
+            # Read scaler and version under the lock so they match the weights
+            scaler, version = self.scalers[slot], self.versions[slot]
+            if scaler is not None:
+                batch = scaler.transform(batch).astype(np.float32)
+            forecasts = self.models[slot](batch, training=False).numpy().reshape(-1)
+        self.batches_run += 1
+        return forecasts, version
+
+    def _serve(self):
+        """
+        Server loop: owns the ROUTER socket (ZMQ sockets are not thread-safe).
+        """
+        socket = self.context.socket(zmq.ROUTER)
+        socket.bind(f"tcp://{self.host}:{self.port}")
+        poller = zmq.Poller()
+        poller.register(socket, zmq.POLLIN)
+
+        try:
+            while not self.stop_event.is_set():
+                if not poller.poll(timeout=100):
+                    continue
+
+                # Collect everything that arrives within the batching window
+                requests = []
+                deadline = time.perf_counter() + INFERENCE_BATCH_WINDOW_MS / 1000.0
+                while len(requests) < INFERENCE_MAX_BATCH:
+                    try:
+                        frames = socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        if time.perf_counter() >= deadline:
+                            break
+                        poller.poll(timeout=INFERENCE_BATCH_WINDOW_MS)
+                        continue
+                    if len(frames) != 3 or frames[1] != b"":
+                        # Not a REQ envelope: nothing we can reply to
+                        logging.warning(f"Node {self.node_id} dropped a malformed message.")
+                        continue
+                    requests.append((frames[0], frames[2]))
+
+                try:
+                    replies = self._handle_requests(requests)
+                except Exception as e:
+                    logging.error(f"Node {self.node_id} failed to handle a batch: {e}")
+                    replies = [(identity, {"error": "Internal error."}) for identity, _ in requests]
+
+                for identity, reply in replies:
+                    socket.send_multipart([identity, b"", json.dumps(reply).encode()])
+        finally:
+            socket.close(linger=0)
+
+    def _parse_window(self, values):
+        window = np.asarray(values, dtype=np.float32)
+        if window.shape != (self.input_shape,) or not np.all(np.isfinite(window)):
+            raise ValueError(f"'window' must be {self.input_shape} finite numbers.")
+        return window
+
+    def _parse_request(self, payload):
+        """
+        Decode and validate one request. Raises ValueError with a message for the client.
+        """
+        try:
+            request = json.loads(payload)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError("Request is not valid JSON.")
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object.")
+
+        op = request.get("op")
+        if op not in ("observe", "forecast"):
+            raise ValueError(f"Unknown op: {op}")
+
+        meter = request.get("meter")
+        if meter is not None and not isinstance(meter, (str, int)):
+            raise ValueError("'meter' must be a string or an integer.")
+
+        if op == "observe":
+            if meter is None or "values" not in request:
+                raise ValueError("'observe' needs 'meter' and 'values'.")
+            values = np.atleast_1d(np.asarray(request["values"], dtype=np.float32))
+            if values.ndim != 1 or not np.all(np.isfinite(values)):
+                raise ValueError("'values' must be a number or a list of finite numbers.")
+            return op, meter, values
+
+        if "window" in request:
+            return op, None, self._parse_window(request["window"])
+        if meter is None:
+            raise ValueError("'forecast' needs 'meter' or 'window'.")
+        return op, meter, None
+
+    def _meter_buffer(self, meter):
+        """
+        Ring buffer of a meter, created on first use. At most INFERENCE_MAX_METERS
+        are kept; the least recently used one is dropped to make room.
+        """
+        buffer = self.buffers.get(meter)
+        if buffer is None:
+            buffer = self.buffers[meter] = WindowBuffer(self.input_shape)
+            if len(self.buffers) > INFERENCE_MAX_METERS:
+                self.buffers.popitem(last=False)
+        self.buffers.move_to_end(meter)
+        return buffer
+
+    def _handle_requests(self, requests):
+        """
+        Answer a micro-batch: observations and cache hits right away,
+        everything else with a single model call.
+        """
+        replies = []
+        pending = []  # (identity, window, cache key)
+        version = self.active[1]
+
+        for identity, payload in requests:
+            self.requests_served += 1
+            try:
+                op, meter, data = self._parse_request(payload)
+            except (ValueError, TypeError, OverflowError) as e:
+                replies.append((identity, {"error": str(e)}))
+                continue
+
+            if op == "observe":
+                buffer = self._meter_buffer(meter)
+                for value in data:
+                    buffer.append(value)
+                replies.append((identity, {"ok": True}))
+                continue
+
+            window = data
+            if window is None:
+                buffer = self.buffers.get(meter)
+                if buffer is not None:
+                    self.buffers.move_to_end(meter)
+                window = buffer.window() if buffer is not None else None
+            if window is None:
+                replies.append((identity, {"error": "Window not available."}))
+                continue
+
+            key = ForecastCache.key(window, version)
+            cached = self.cache.get(key)
+            if cached is not None:
+                replies.append((identity, {"forecast": cached, "version": version, "cached": True}))
+            else:
+                pending.append((identity, window, key))
+
+        if pending:
+            try:
+                forecasts, version = self.predict_batch([window for _, window, _ in pending])
+            except Exception as e:
+                logging.error(f"Node {self.node_id} inference failed: {e}")
+                replies.extend((identity, {"error": str(e)}) for identity, _, _ in pending)
+                return replies
+
+            for (identity, _, key), forecast in zip(pending, forecasts):
+                value = float(forecast)
+                # The key must match the version that actually produced the forecast
+                self.cache.put((key[0], version), value)
+                replies.append((identity, {"forecast": value, "version": version, "cached": False}))
+
+        return replies
@@ -1,13 +1,35 @@
+import copy
 import logging
 import os
+import time
 import zmq
 import threading
 
 from consensus import ByzantineFaultTolerance
-from config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, NODE_PORTS
+from config import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_FILE,
+    NODE_PORTS,
+    ENABLE_INFERENCE_SERVER,
+    INFERENCE_SERVE_SECONDS,
+    SHARED_SCALER,
+    STREAM_MODE,
+    STREAM_FILE,
+    STREAM_FEED_PORT,
+    STREAM_ROUNDS,
+    STREAM_ROUND_INTERVAL,
+)
 from data_loader import load_data, combine_datetime, set_index, handle_missing_values
-from preprocessing import feature_engineering, split_data, preprocess_data, convert_dtype
+from preprocessing import (
+    feature_engineering,
+    split_data,
+    preprocess_data,
+    convert_dtype,
+    RunningScaler,
+)
 from node import Node
+from streaming import FileTailFeed, ZmqFeed, StreamingLearner
 from visualization import check_data_distribution, visualize_loss
 
 
@@ -65,12 +87,72 @@ def node_operations_with_bft(node, nodes):
     logging.info(f"Node {node.node_id} finished training + aggregation.")
 
 
+def node_operations_streaming(node, feed, scaler, rounds=STREAM_ROUNDS):
+    """
+    Streaming worker routine (run per node in a thread).
+
+    The node is trained once on the historical data, then once per round:
+    1) Pull new readings from the live feed
+    2) Score them with the current model, then run a few incremental training steps
+    3) Adapt the broadcast threshold to the trend of those scores
+    4) Gossip: broadcast (event-triggered) and aggregate neighbors' weights
+    """
+    node.train()
+
+    # The inference server snapshots node.scaler on every weight swap, so
+    # served forecasts follow the same running statistics as training.
+    node.scaler = scaler
+    learner = StreamingLearner(node, scaler)
+    try:
+        for _ in range(rounds):
+            learner.ingest(feed.poll())
+            train_loss = learner.train_steps()
+            node.record_round(train_loss, learner.holdout_loss)
+            node.broadcast_weights()
+            node.receive_weights()
+            time.sleep(STREAM_ROUND_INTERVAL)
+    finally:
+        feed.close()
+
+    logging.info(
+        f"Node {node.node_id} finished streaming ({learner.readings_seen} readings)."
+    )
+
+
+def serve_final_models(seconds=INFERENCE_SERVE_SECONDS):
+    """
+    Keep the inference servers up after training so clients can query the
+    final consensus model. Runs for `seconds`, or until Ctrl-C if None.
+    """
+    logging.info(
+        "Serving the final models "
+        + (f"for {seconds} s." if seconds is not None else "until Ctrl-C.")
+    )
+    try:
+        if seconds is None:
+            threading.Event().wait()
+        else:
+            time.sleep(seconds)
+    except KeyboardInterrupt:
+        logging.info("Stopping the inference servers.")
+
+
+def create_feed(context):
+    """
+    Live data source for streaming mode: ZMQ feed if a port is configured,
+    otherwise follow STREAM_FILE.
+    """
+    if STREAM_FEED_PORT is not None:
+        return ZmqFeed(context, STREAM_FEED_PORT)
+    return FileTailFeed(STREAM_FILE)
+
+
 def main():
     """
     Entry point:
     - Load + prepare data
     - Create nodes
-    - Train each node in parallel threads
+    - Train each node in parallel threads (batch, or online if STREAM_MODE)
     - Plot basic results
     """
     setup_logging()
@@ -83,7 +165,11 @@ def main():
 
     X, y = feature_engineering(df)
     X_train, X_test, y_train, y_test = split_data(X, y)
-    X_train, X_test, _ = preprocess_data(X_train, X_test)
+    if SHARED_SCALER:
+        # Keep raw features: each node scales with statistics shared over the mesh
+        scaler = None
+    else:
+        X_train, X_test, scaler = preprocess_data(X_train, X_test)
     X_train, X_test, y_train, y_test = convert_dtype(X_train, X_test, y_train, y_test)
 
     # ---- Communication context ----
@@ -93,10 +179,43 @@ def main():
     initial_node, other_nodes = initialize_nodes(context, X_train, y_train, X_test, y_test)
     all_nodes = [initial_node] + other_nodes
 
+    # ---- Shared scaling: one statistics exchange before training ----
+    if SHARED_SCALER:
+        sync_threads = [threading.Thread(target=node.sync_scaler) for node in all_nodes]
+        for t in sync_threads:
+            t.start()
+        for t in sync_threads:
+            t.join()
+        partial = [node.node_id for node in all_nodes if node.scaler_nodes < len(NODE_PORTS)]
+        if partial:
+            # Nodes would scale their inputs differently, so their models would not agree
+            raise RuntimeError(
+                f"Shared scaler statistics did not reach every node (nodes {partial}). "
+                f"Make NODE_PORTS strongly connected or raise SCALER_SYNC_TIMEOUT_MS."
+            )
+
+    # ---- Optional forecasting service (always serves the latest weights) ----
+    # Until aggregation the servers answer with the starting weights; the
+    # consensus model is swapped in by set_weights and served after training.
+    # X_train is already scaled, so the servers get the scaler for raw windows
+    # (scaler is None with SHARED_SCALER, then each node uses its own).
+    if ENABLE_INFERENCE_SERVER:
+        for node in all_nodes:
+            node.start_inference_server(scaler=scaler)
+
     # ---- Run nodes in parallel ----
     threads = []
     for node in all_nodes:
-        t = threading.Thread(target=node_operations_with_bft, args=(node, all_nodes))
+        if STREAM_MODE:
+            # Each node continues from its starting scaler with its own running statistics
+            if SHARED_SCALER:
+                stream_scaler = copy.deepcopy(node.scaler)
+            else:
+                stream_scaler = RunningScaler.from_scaler(scaler)
+            args = (node, create_feed(context), stream_scaler)
+            t = threading.Thread(target=node_operations_streaming, args=args)
+        else:
+            t = threading.Thread(target=node_operations_with_bft, args=(node, all_nodes))
         threads.append(t)
         t.start()
 
@@ -104,6 +223,12 @@ def main():
         t.join()
 
     logging.info("All nodes finished.")
+    if ENABLE_INFERENCE_SERVER:
+        serve_final_models()
+        for node in all_nodes:
+            node.stop_inference_server()
+    for node in all_nodes:
+        logging.info(f"Node {node.node_id} broadcast stats: {node.communication_stats()}")
 
     # ---- Simple plots ----
     check_data_distribution(all_nodes)
@@ -1,45 +1,158 @@
 import tensorflow as tf
 import logging
-from config import L2_REGULARIZATION, DROPOUT_RATE, LEARNING_RATE
+from config import (
+    L2_REGULARIZATION,
+    DROPOUT_RATE,
+    LEARNING_RATE,
+    MODEL_ARCHITECTURE,
+    MODEL_PRECISION,
+)
 
 
-def create_model(input_shape):
+def dense_layers(input_shape, dtype):
     """
-    A feed-forward regression model.
+    The original feed-forward regression model (512-256-128).
 
     Notes:
     - Input is a fixed-size feature vector (look-back window after preprocessing).
     - L2 regularization + dropout help reduce overfitting.
+    """
+    return [
+        tf.keras.layers.Input(shape=(input_shape,)),
+
+        # Bigger layer first: learns a strong representation
+        tf.keras.layers.Dense(
+            512,
+            activation="relu",
+            kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
+            dtype=dtype,
+        ),
+        tf.keras.layers.Dropout(DROPOUT_RATE, dtype=dtype),
+
+        # Gradually reduce width to compress useful features
+        tf.keras.layers.Dense(
+            256,
+            activation="relu",
+            kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
+            dtype=dtype,
+        ),
+        tf.keras.layers.Dropout(DROPOUT_RATE, dtype=dtype),
+
+        tf.keras.layers.Dense(
+            128,
+            activation="relu",
+            kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
+            dtype=dtype,
+        ),
+    ]
+
+
+def compact_mlp_layers(input_shape, dtype):
+    """
+    A small MLP (64-32). With LOOK_BACK = 24 inputs: 3,713 parameters vs
+    177,153 for the dense model (~48x fewer).
+    """
+    return [
+        tf.keras.layers.Input(shape=(input_shape,)),
+        tf.keras.layers.Dense(
+            64,
+            activation="relu",
+            kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
+            dtype=dtype,
+        ),
+        tf.keras.layers.Dense(
+            32,
+            activation="relu",
+            kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
+            dtype=dtype,
+        ),
+    ]
+
+
+def tcn_layers(input_shape, dtype):
+    """
+    A small temporal convolutional network over the look-back window:
+    stacked causal 1D convolutions with growing dilation (1, 2, 4).
+    """
+    return [
+        tf.keras.layers.Input(shape=(input_shape,)),
+        # Treat the window as a sequence with one channel
+        tf.keras.layers.Reshape((input_shape, 1), dtype=dtype),
+        *[
+            tf.keras.layers.Conv1D(
+                16, 3, padding="causal", dilation_rate=rate, activation="relu", dtype=dtype
+            )
+            for rate in (1, 2, 4)
+        ],
+        tf.keras.layers.GlobalAveragePooling1D(dtype=dtype),
+    ]
+
+
+def gru_layers(input_shape, dtype):
+    """
+    A small recurrent model: one GRU layer reading the window step by step.
+    Unrolled over the (short) window so TFLite converts it to builtin ops.
+    """
+    return [
+        tf.keras.layers.Input(shape=(input_shape,)),
+        tf.keras.layers.Reshape((input_shape, 1), dtype=dtype),
+        tf.keras.layers.GRU(32, unroll=True, dtype=dtype),
+    ]
+
+
+ARCHITECTURES = {
+    "dense": dense_layers,
+    "compact_mlp": compact_mlp_layers,
+    "tcn": tcn_layers,
+    "gru": gru_layers,
+}
+
+
+def cpu_supports_bfloat16():
+    """
+    Check for native bfloat16 instructions (AVX512-BF16 or AMX) on Linux.
+    Without them TensorFlow emulates bfloat16, which is slower than float32.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def resolve_precision(precision):
+    """
+    Return the Keras dtype policy to build layers with.
+    """
+    if precision == "float32":
+        return "float32"
+    if precision == "mixed_bfloat16":
+        if tf.config.list_physical_devices("GPU") or cpu_supports_bfloat16():
+            return tf.keras.mixed_precision.Policy("mixed_bfloat16")
+        logging.warning("No native bfloat16 support found. Falling back to float32.")
+        return "float32"
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+def create_model(input_shape, architecture=MODEL_ARCHITECTURE, precision=MODEL_PRECISION):
+    """
+    Build and compile a regression model.
+
+    - architecture: one of ARCHITECTURES ("dense", "compact_mlp", "tcn", "gru")
+    - precision: "float32" or "mixed_bfloat16"; with mixed precision the math runs
+      in bfloat16 but the weights stay float32, so nodes can still aggregate them.
     - Output is a single number (next-step consumption).
     """
+    if architecture not in ARCHITECTURES:
+        raise ValueError(f"Unknown architecture: {architecture}")
+    dtype = resolve_precision(precision)
+
     model = tf.keras.Sequential(
-        [
-            tf.keras.layers.Input(shape=(input_shape,)),
-
-            # Bigger layer first: learns a strong representation
-            tf.keras.layers.Dense(
-                512,
-                activation="relu",
-                kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
-            ),
-            tf.keras.layers.Dropout(DROPOUT_RATE),
-
-            # Gradually reduce width to compress useful features
-            tf.keras.layers.Dense(
-                256,
-                activation="relu",
-                kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
-            ),
-            tf.keras.layers.Dropout(DROPOUT_RATE),
-
-            tf.keras.layers.Dense(
-                128,
-                activation="relu",
-                kernel_regularizer=tf.keras.regularizers.l2(L2_REGULARIZATION),
-            ),
-
-            # Regression output: no activation
-            tf.keras.layers.Dense(1),
+        ARCHITECTURES[architecture](input_shape, dtype)
+        + [
+            # Regression output: no activation (kept in float32 for numeric stability)
+            tf.keras.layers.Dense(1, dtype="float32"),
         ]
     )
 
@@ -49,5 +162,38 @@ def create_model(input_shape):
         metrics=["mae"],
     )
 
-    logging.info("Model created and compiled.")
+    logging.info(
+        f"Model created and compiled ({architecture}, {effective_precision(model)}, "
+        f"{model.count_params()} params)."
+    )
     return model
+
+
+def effective_precision(model):
+    """
+    Dtype policy the model actually computes with (after any float32 fallback).
+    The Sequential container keeps the global policy, so read it from the first layer.
+    """
+    return model.layers[0].dtype_policy.name
+
+
+def export_tflite(model, path, quantize=False):
+    """
+    Convert a Keras model to a TFLite flatbuffer for edge nodes.
+
+    - quantize: apply post-training weight quantization (Optimize.DEFAULT).
+      Off by default so the exported model matches the Keras weights.
+    - Every architecture converts to builtin ops only (the GRU is unrolled),
+      so the file runs on the standard tflite-runtime interpreter.
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    tflite_model = converter.convert()
+
+    with open(path, "wb") as f:
+        f.write(tflite_model)
+    logging.info(
+        f"TFLite model written to {path} ({len(tflite_model)} bytes, quantized={quantize})."
+    )
+    return path
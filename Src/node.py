@@ -9,9 +9,32 @@ from communication import (
     setup_subscribers,
     serialize_weights,
     deserialize_weights,
+    weights_drift,
+    exchange_stats,
+    is_stats_message,
+    drain,
 )
 from consensus import ByzantineFaultTolerance
-from config import NODE_PORTS, BATCH_SIZE, EPOCHS, RANDOM_STATE
+from inference import InferenceServer
+from preprocessing import RunningScaler
+from config import (
+    NODE_PORTS,
+    INFERENCE_PORTS,
+    BATCH_SIZE,
+    EPOCHS,
+    RANDOM_STATE,
+    BROADCAST_DRIFT_THRESHOLD,
+    BROADCAST_MIN_THRESHOLD,
+    BROADCAST_MAX_THRESHOLD,
+    BROADCAST_MAX_INTERVAL,
+    BROADCAST_TREND_WINDOW,
+    BROADCAST_PLATEAU_TOLERANCE,
+    SCALER_SYNC_TIMEOUT_MS,
+    SCALER_SYNC_REPUBLISH_MS,
+    SCALER_SYNC_HOPS,
+    SCALER_SKETCH_SIZE,
+    SCALER_ROBUST,
+)
 
 
 class Node:
@@ -51,6 +74,18 @@ class Node:
         self.publisher_socket = setup_publisher(context, self.publish_port)
         self.subscriber_sockets = setup_subscribers(context, self.neighbors)
 
+        # Event-triggered broadcasting state
+        self.broadcast_threshold = BROADCAST_DRIFT_THRESHOLD
+        self.last_broadcast_weights = None
+        self.calls_since_broadcast = 0
+        self.broadcasts_sent = 0
+        self.broadcasts_skipped = 0
+        # Losses per gossip round (the threshold adapts to the holdout trend)
+        self.round_history = {"loss": [], "holdout_loss": []}
+
+        self.scaler = None
+        self.scaler_nodes = 0  # nodes whose statistics the shared scaler includes
+        self.inference_server = None
         self.history = None
         logging.info(f"Node {self.node_id} initialized (PUB {self.publish_port}).")
 
@@ -62,6 +97,55 @@ class Node:
         ds = ds.shuffle(buffer_size=len(X)).batch(BATCH_SIZE)
         return ds
 
+    def sync_scaler(self):
+        """
+        Scale this node's (raw) data with statistics shared over the mesh.
+
+        Only sufficient statistics leave the node (count / mean / M2 and
+        optional quantile sketches); they are gossiped and relayed by node id,
+        see communication.exchange_stats. They are sent in the clear: this is
+        not secure aggregation.
+        """
+        scaler = RunningScaler(sketch_size=SCALER_SKETCH_SIZE, robust=SCALER_ROBUST)
+        scaler.partial_fit(self.X_train)
+
+        other_stats, neighbors_heard = exchange_stats(
+            self.publisher_socket,
+            self.subscriber_sockets,
+            self.node_id,
+            scaler.to_stats(),
+            SCALER_SYNC_TIMEOUT_MS,
+            SCALER_SYNC_HOPS,
+            SCALER_SYNC_REPUBLISH_MS,
+            total_nodes=len(NODE_PORTS),
+        )
+        for stats in other_stats.values():
+            scaler.merge_stats(stats)
+
+        if neighbors_heard < len(self.subscriber_sockets):
+            logging.warning(
+                f"Node {self.node_id}: only {neighbors_heard} of "
+                f"{len(self.subscriber_sockets)} neighbors sent scaler statistics."
+            )
+        covered = len(other_stats) + 1
+        if covered < len(NODE_PORTS):
+            logging.warning(
+                f"Node {self.node_id}: scaler covers {covered} of {len(NODE_PORTS)} nodes; "
+                f"nodes may scale their inputs differently."
+            )
+
+        self.X_train = scaler.transform(self.X_train).astype(np.float32)
+        self.X_test = scaler.transform(self.X_test).astype(np.float32)
+        self.train_dataset = self.create_tf_dataset(self.X_train, self.y_train)
+        self.test_dataset = self.create_tf_dataset(self.X_test, self.y_test)
+        self.scaler = scaler
+        self.scaler_nodes = covered
+
+        logging.info(
+            f"Node {self.node_id} scaler synced over {covered} node(s) ({scaler.count} samples)."
+        )
+        return scaler
+
     def train(self):
         """
         Train locally on this node's data.
@@ -105,29 +189,138 @@ class Node:
         self.model.set_weights(weights)
         logging.info(f"Node {self.node_id} weights updated.")
 
-    def broadcast_weights(self):
+        # Serve forecasts from the new (e.g. freshly aggregated) weights,
+        # scaled like the data they were trained on
+        if self.inference_server is not None:
+            self.inference_server.update_model(weights, scaler=self.scaler)
+
+    def start_inference_server(self, scaler=None):
         """
-        Send this node's weights to neighbors.
+        Start the local forecasting service with the current weights.
+        Defaults to the node's shared scaler (if sync_scaler() was run).
+        """
+        self.inference_server = InferenceServer(
+            self.node_id,
+            self.context,
+            INFERENCE_PORTS[self.node_id],
+            input_shape=self.X_train.shape[1],
+            scaler=scaler if scaler is not None else self.scaler,
+        )
+        self.inference_server.update_model(self.get_weights())
+        self.inference_server.start()
+        return self.inference_server
+
+    def stop_inference_server(self):
+        if self.inference_server is not None:
+            self.inference_server.stop()
+            self.inference_server = None
+
+    def record_round(self, train_loss=None, holdout_loss=None):
+        """
+        Per-gossip-round bookkeeping: store the loss of this round's incremental
+        steps and the loss on its new, not yet trained on samples (see
+        StreamingLearner.ingest), then adapt the broadcast threshold.
+        Rounds without new data store nothing.
+        """
+        if train_loss is not None:
+            self.round_history["loss"].append(train_loss)
+        if holdout_loss is not None:
+            self.round_history["holdout_loss"].append(holdout_loss)
+
+        return self.adapt_broadcast_threshold()
+
+    def adapt_broadcast_threshold(self):
+        """
+        Adjust the drift threshold from the holdout-loss trend over the
+        last gossip rounds (see record_round).
+
+        - loss still improving: halve the threshold (share progress quickly)
+        - loss on a plateau: double the threshold (save traffic)
+        - loss getting worse: go back to the configured default
+        """
+        holdout_loss = self.round_history["holdout_loss"]
+        if len(holdout_loss) < 2 * BROADCAST_TREND_WINDOW:
+            return self.broadcast_threshold
+
+        previous = np.mean(holdout_loss[-2 * BROADCAST_TREND_WINDOW : -BROADCAST_TREND_WINDOW])
+        recent = np.mean(holdout_loss[-BROADCAST_TREND_WINDOW:])
+        improvement = (previous - recent) / (abs(previous) + 1e-12)
+
+        if improvement > BROADCAST_PLATEAU_TOLERANCE:
+            self.broadcast_threshold = max(self.broadcast_threshold * 0.5, BROADCAST_MIN_THRESHOLD)
+        elif improvement < -BROADCAST_PLATEAU_TOLERANCE:
+            self.broadcast_threshold = BROADCAST_DRIFT_THRESHOLD
+        else:
+            self.broadcast_threshold = min(self.broadcast_threshold * 2.0, BROADCAST_MAX_THRESHOLD)
+        return self.broadcast_threshold
+
+    def should_broadcast(self, weights):
+        """
+        Event trigger: send if the weights drifted past the threshold since
+        the last broadcast, or if we skipped too many times in a row.
+        """
+        if self.last_broadcast_weights is None:
+            return True
+        if self.calls_since_broadcast >= BROADCAST_MAX_INTERVAL:
+            return True
+        drift = weights_drift(weights, self.last_broadcast_weights)
+        return drift > self.broadcast_threshold
+
+    def broadcast_weights(self, force=False):
+        """
+        Send this node's weights to neighbors (event-triggered).
+
+        Returns True if the weights were sent, False if the broadcast was skipped.
+        Use force=True to bypass the trigger.
         """
         weights = self.get_weights()
+        if not force and not self.should_broadcast(weights):
+            self.calls_since_broadcast += 1
+            self.broadcasts_skipped += 1
+            logging.info(
+                f"Node {self.node_id} skipped broadcast "
+                f"(threshold={self.broadcast_threshold:.4f}, skipped={self.broadcasts_skipped})."
+            )
+            return False
+
         self.publisher_socket.send(serialize_weights(weights))
+        self.last_broadcast_weights = [np.copy(w) for w in weights]
+        self.calls_since_broadcast = 0
+        self.broadcasts_sent += 1
         logging.info(f"Node {self.node_id} broadcasted weights.")
+        return True
+
+    def communication_stats(self):
+        """
+        Counters for the event-triggered broadcasting policy.
+        """
+        return {
+            "sent": self.broadcasts_sent,
+            "skipped": self.broadcasts_skipped,
+            "threshold": self.broadcast_threshold,
+        }
 
     def receive_weights(self):
         """
         Receive weights from neighbors (non-blocking).
+        Each socket is drained and only its newest weights are kept, so a
+        backlog (e.g. late scaler statistics) never makes a node lag behind.
         If a neighbor doesn't respond, we continue with what we have.
         """
         local_weights = self.get_weights()
         weights_list = [local_weights]
 
         for sock in self.subscriber_sockets:
-            try:
-                msg = sock.recv(flags=zmq.NOBLOCK)
-                if msg:
-                    weights_list.append(deserialize_weights(msg))
-                    logging.info(f"Node {self.node_id} received weights from a neighbor.")
-            except zmq.Again:
+            newest = None
+            for msg in drain(sock):
+                received = deserialize_weights(msg)
+                if not is_stats_message(received):
+                    newest = received
+
+            if newest is not None:
+                weights_list.append(newest)
+                logging.info(f"Node {self.node_id} received weights from a neighbor.")
+            else:
                 logging.warning(f"Node {self.node_id} did not receive weights from one neighbor.")
 
         # Robust aggregation to reduce impact of odd/outlier updates
@@ -55,6 +55,172 @@ def preprocess_data(X_train, X_test):
     return X_train, X_test, scaler
 
 
+class RunningScaler:
+    """
+    A StandardScaler that can be updated incrementally.
+
+    Keeps count / mean / M2 per feature and merges new batches with the
+    parallel form of Welford's algorithm, so new readings never require
+    another pass over the full history.
+
+    Optionally keeps a quantile sketch per feature: the values at sketch_size
+    evenly spaced quantile levels. Sketches merge by combining their CDFs
+    weighted by count, so the resolution follows the data instead of a fixed
+    value range. With robust=True, transform() uses median / IQR from the
+    sketches instead of mean / std.
+
+    Statistics from other nodes can be merged in with merge_stats(), which is
+    how nodes share one scaling. The statistics are plain aggregates: sharing
+    them is not secure aggregation (nothing is masked or encrypted).
+    """
+
+    def __init__(self, sketch_size=None, robust=False, sketch_buffer=256):
+        if robust and sketch_size is None:
+            raise ValueError("Robust scaling needs a quantile sketch.")
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.levels = None if sketch_size is None else np.linspace(0.0, 1.0, sketch_size)
+        self.sketch = None  # (n_features, sketch_size)
+        self.sketch_count = 0
+        # Small batches are buffered before being merged into the sketch:
+        # every merge re-samples the CDF, and many tiny merges add up to bias.
+        self.sketch_buffer = sketch_buffer
+        self._pending = []
+        self._pending_rows = 0
+        self.robust = robust
+        self._params = None
+
+    @classmethod
+    def from_scaler(cls, scaler):
+        """
+        Continue from a fitted sklearn StandardScaler (e.g. the batch pipeline's).
+        """
+        running = cls()
+        running.count = int(np.max(scaler.n_samples_seen_))
+        running.mean = np.array(scaler.mean_, dtype=np.float64)
+        running.m2 = np.array(scaler.var_, dtype=np.float64) * running.count
+        return running
+
+    def merge(self, count, mean, m2):
+        """
+        Combine these statistics with another set (count, mean, M2).
+        """
+        if count == 0:
+            return self
+        mean = np.asarray(mean, dtype=np.float64)
+        m2 = np.asarray(m2, dtype=np.float64)
+        self._params = None
+        if self.count == 0:
+            self.count, self.mean, self.m2 = count, mean.copy(), m2.copy()
+            return self
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta**2 * (self.count * count / total)
+        self.count = total
+        return self
+
+    def partial_fit(self, X):
+        """
+        Update the statistics with a batch of rows (a single row works too).
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if len(X) == 0:
+            return self
+        if self.levels is not None:
+            self._pending.append(X)
+            self._pending_rows += len(X)
+            if self._pending_rows >= self.sketch_buffer:
+                self._flush_sketch()
+        batch_mean = X.mean(axis=0)
+        batch_m2 = np.sum((X - batch_mean) ** 2, axis=0)
+        return self.merge(len(X), batch_mean, batch_m2)
+
+    def _flush_sketch(self):
+        if self._pending_rows == 0:
+            return
+        X = np.vstack(self._pending)
+        self._pending, self._pending_rows = [], 0
+        self._merge_sketch(len(X), np.quantile(X, self.levels, axis=0).T)
+
+    def _merge_sketch(self, count, sketch):
+        """
+        Merge another quantile sketch of `count` rows.
+
+        Both sketches are read as piecewise-linear CDFs; the merged CDF is their
+        count-weighted average, re-sampled at the sketch levels.
+        """
+        self._params = None
+        if self.sketch is None or self.sketch_count == 0:
+            self.sketch = np.array(sketch, dtype=np.float64)
+            self.sketch_count = count
+            return
+        merged = np.empty_like(self.sketch)
+        weight = count / (self.sketch_count + count)
+        for f in range(len(self.sketch)):
+            points = np.union1d(self.sketch[f], sketch[f])
+            own_cdf = np.interp(points, self.sketch[f], self.levels)
+            other_cdf = np.interp(points, sketch[f], self.levels)
+            cdf = (1.0 - weight) * own_cdf + weight * other_cdf
+            merged[f] = np.interp(self.levels, cdf, points)
+        self.sketch = merged
+        self.sketch_count += count
+
+    def to_stats(self):
+        """
+        Sufficient statistics to share with other nodes (no raw data).
+        """
+        if self.levels is not None:
+            self._flush_sketch()
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "sketch": self.sketch}
+
+    def merge_stats(self, stats):
+        """
+        Merge statistics produced by another node's to_stats().
+        """
+        if stats["sketch"] is not None and self.levels is not None:
+            self._merge_sketch(stats["count"], stats["sketch"])
+        return self.merge(stats["count"], stats["mean"], stats["m2"])
+
+    def quantile(self, q):
+        """
+        Per-feature quantile estimated from the sketches (linear between levels).
+        """
+        if self.levels is not None:
+            self._flush_sketch()
+        if self.sketch is None:
+            raise ValueError("No quantile sketch available.")
+        return np.array([np.interp(q, self.levels, feature) for feature in self.sketch])
+
+    @property
+    def var(self):
+        return self.m2 / self.count
+
+    @property
+    def scale(self):
+        # Same convention as sklearn: constant features are left unscaled
+        scale = np.sqrt(self.var)
+        return np.where(scale == 0, 1.0, scale)
+
+    def _center_and_scale(self):
+        if self._params is None:
+            if self.robust:
+                q25, median, q75 = self.quantile(0.25), self.quantile(0.5), self.quantile(0.75)
+                iqr = q75 - q25
+                self._params = (median, np.where(iqr == 0, 1.0, iqr))
+            else:
+                self._params = (self.mean, self.scale)
+        return self._params
+
+    def transform(self, X):
+        if self.count == 0:
+            raise ValueError("RunningScaler has not seen any data yet.")
+        center, scale = self._center_and_scale()
+        return (np.asarray(X, dtype=np.float64) - center) / scale
+
+
 def convert_dtype(X_train, X_test, y_train, y_test):
     """
     TensorFlow runs more efficiently with float32,
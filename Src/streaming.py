@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+from collections import deque
+
+import numpy as np
+import zmq
+
+from config import (
+    LOOK_BACK,
+    BATCH_SIZE,
+    RANDOM_STATE,
+    STREAM_MAX_READINGS_PER_ROUND,
+    STREAM_REPLAY_CAPACITY,
+    STREAM_TRAIN_STEPS,
+)
+
+
+class FileTailFeed:
+    """
+    Stand-in for a live sensor feed: follow a CSV file like `tail -f`.
+
+    Every complete new line is parsed and its last column is used as the
+    consumption reading. Headers and malformed lines are skipped.
+    If the file does not exist yet, poll() returns nothing until it appears
+    and then reads it from the start.
+    """
+
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self.file = None
+        self.partial = ""
+        if not self._open(from_start):
+            logging.warning(f"Stream file {path} does not exist yet; waiting for it.")
+
+    def _open(self, from_start=True):
+        try:
+            self.file = open(self.path, "r")
+        except FileNotFoundError:
+            return False
+        if not from_start:
+            self.file.seek(0, os.SEEK_END)
+        return True
+
+    def poll(self, max_items=STREAM_MAX_READINGS_PER_ROUND):
+        """
+        Return the readings appended since the last call (never blocks).
+        """
+        readings = []
+        if self.file is None and not self._open():
+            return readings
+        while len(readings) < max_items:
+            line = self.file.readline()
+            if not line:
+                break
+            if not line.endswith("\n"):
+                # Writer is still in the middle of this line
+                self.partial += line
+                break
+            line, self.partial = self.partial + line, ""
+            try:
+                readings.append(float(line.strip().split(",")[-1]))
+            except ValueError:
+                continue
+        return readings
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class ZmqFeed:
+    """
+    Stand-in for a live sensor feed over ZeroMQ.
+    The publisher sends JSON readings (a number or a list of numbers); sensors
+    are not trusted like mesh peers, so pickle is never used. Invalid
+    messages are dropped.
+    """
+
+    def __init__(self, context, port):
+        self.socket = context.socket(zmq.SUB)
+        self.socket.connect(f"tcp://localhost:{port}")
+        self.socket.setsockopt(zmq.SUBSCRIBE, b"")
+
+    def poll(self, max_items=STREAM_MAX_READINGS_PER_ROUND):
+        readings = []
+        while len(readings) < max_items:
+            try:
+                message = self.socket.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            try:
+                values = np.atleast_1d(np.asarray(json.loads(message), dtype=np.float32))
+            except (ValueError, TypeError, UnicodeDecodeError):
+                values = None
+            if values is None or values.ndim != 1 or not np.all(np.isfinite(values)):
+                logging.warning("Dropped an invalid message from the sensor feed.")
+                continue
+            readings.extend(float(v) for v in values)
+        return readings
+
+    def close(self):
+        self.socket.close(linger=0)
+
+
+class ReplayBuffer:
+    """
+    Bounded buffer of raw (window, target) pairs.
+    Once full, the oldest samples are overwritten.
+    """
+
+    def __init__(self, capacity=STREAM_REPLAY_CAPACITY, look_back=LOOK_BACK):
+        self.capacity = capacity
+        self.X = np.zeros((capacity, look_back), dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(RANDOM_STATE)
+
+    def add(self, X, y):
+        indices = (self.position + np.arange(len(X))) % self.capacity
+        self.X[indices] = X
+        self.y[indices] = y
+        self.position = (self.position + len(X)) % self.capacity
+        self.size = min(self.size + len(X), self.capacity)
+
+    def sample(self, batch_size):
+        indices = self.rng.integers(self.size, size=batch_size)
+        return self.X[indices], self.y[indices]
+
+
+class StreamingLearner:
+    """
+    Online learning for one node.
+
+    New readings are turned into LOOK_BACK windows, the running scaler is
+    updated with them, and the windows go into a replay buffer. Between
+    gossip rounds the node runs a few short training steps on replayed
+    samples instead of retraining on the full history.
+    """
+
+    def __init__(self, node, scaler, look_back=LOOK_BACK):
+        self.node = node
+        self.scaler = scaler
+        self.look_back = look_back
+        self.recent = deque(maxlen=look_back)
+        self.replay = ReplayBuffer(look_back=look_back)
+        self.new_samples = 0
+        self.readings_seen = 0
+        # Loss on this round's new samples, measured before training on them
+        self.holdout_loss = None
+
+    def ingest(self, readings):
+        """
+        Add new readings; every reading after the first LOOK_BACK yields one sample.
+
+        New samples are scored with the current model and scaler before they
+        enter the replay buffer (test-then-train), so holdout_loss tracks how
+        well the model forecasts data it has not seen yet.
+        """
+        self.holdout_loss = None
+        windows, targets = [], []
+        for value in readings:
+            if len(self.recent) == self.look_back:
+                windows.append(list(self.recent))
+                targets.append(value)
+            self.recent.append(value)
+        self.readings_seen += len(readings)
+
+        if windows:
+            X = np.asarray(windows, dtype=np.float32)
+            y = np.asarray(targets, dtype=np.float32)
+            self.scaler.partial_fit(X)
+            X_scaled = self.scaler.transform(X).astype(np.float32)
+            self.holdout_loss, _ = self.node.model.test_on_batch(X_scaled, y)
+            self.replay.add(X, y)
+            self.new_samples += len(X)
+        return len(windows)
+
+    def train_steps(self, steps=STREAM_TRAIN_STEPS, batch_size=BATCH_SIZE):
+        """
+        Run a few mini-batch updates on replayed samples.
+        Does nothing if no new data arrived since the last call.
+        """
+        if self.new_samples == 0 or self.replay.size < batch_size:
+            return None
+
+        loss = None
+        for _ in range(steps):
+            X, y = self.replay.sample(batch_size)
+            # Scale at sampling time so old samples follow the latest statistics
+            X = self.scaler.transform(X).astype(np.float32)
+            loss, _ = self.node.model.train_on_batch(X, y)
+
+        logging.info(
+            f"Node {self.node.node_id} incremental training on {self.new_samples} new samples: "
+            f"loss={loss:.4f}"
+        )
+        self.new_samples = 0
+        return loss